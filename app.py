@@ -12,12 +12,16 @@ from __future__ import annotations
 from datetime import date, datetime
 from enum import Enum
 from typing import Optional
-import os
+import hashlib, os, time
 
-from flask import Flask, redirect, render_template, request, session, url_for, flash, Response
+from flask import Flask, g, jsonify, redirect, request, session, url_for, flash, Response
 from jinja2 import DictLoader
-from sqlalchemy import create_engine, ForeignKey, select, func
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, Session
+from markupsafe import Markup
+from sqlalchemy import create_engine, event, case, delete, ForeignKey, Index, insert, select, update, func
+from sqlalchemy.orm import (DeclarativeBase, Mapped, mapped_column, relationship, Session, sessionmaker,
+                            selectinload, raiseload, load_only, query_expression, with_expression)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.types import String, Text, Date
 
 # ----------------------------------------------------------------------------
@@ -27,12 +31,39 @@ DB_PATH = os.environ.get("REMINDER_DB", "reminder.sqlite3")
 SECRET_KEY = os.environ.get("REMINDER_SECRET", "dev-secret-change-me")
 
 app = Flask(__name__)
-app.config.update(SECRET_KEY=SECRET_KEY)
-engine = create_engine(f"sqlite:///{DB_PATH}", echo=False, future=True)
+app.config.update(SECRET_KEY=SECRET_KEY, TEMPLATES_AUTO_RELOAD=False)
+
+# SQLite Engine: Verbindungen über den Pool wiederverwenden (Main + Kiosk teilen die DB)
+engine = create_engine(
+    f"sqlite:///{DB_PATH}",
+    echo=False,
+    future=True,
+    connect_args={"check_same_thread": False},
+    pool_size=5,
+    max_overflow=10,
+    pool_pre_ping=True,
+    query_cache_size=1200,  # kompilierte Statements über Sessions/Requests hinweg wiederverwenden
+)
+
+# WAL: Leser blockieren Schreiber nicht mehr, Commits ohne vollen fsync
+@event.listens_for(engine, "connect")
+def _sqlite_pragmas(dbapi_con, _):
+    cur = dbapi_con.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA busy_timeout=5000")
+    cur.execute("PRAGMA cache_size=-65536")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA foreign_keys=ON")
+    cur.close()
 
 class Base(DeclarativeBase):
     pass
 
+# Aktuelle UTC-Zeit als SQL-Ausdruck mit Millisekunden (CURRENT_TIMESTAMP hat nur Sekunden,
+# zu grob für den updated_at-basierten Cache-Schlüssel)
+SQL_NOW = func.strftime("%Y-%m-%d %H:%M:%f", "now")
+
 # ----------------------------------------------------------------------------
 # Modelle
 # ----------------------------------------------------------------------------
@@ -46,6 +77,15 @@ class Status(str, Enum):
     done = "Erledigt"
     discarded = "Verworfen"
 
+PRIORITY_VALUES = frozenset(p.value for p in Priority)
+STATUS_VALUES = frozenset(s.value for s in Status)
+
+# Auswahllisten für die Templates (als Jinja-Globals registriert)
+STATUS_CHOICES = (Status.open.value, Status.done.value, Status.discarded.value)
+PRIORITY_CHOICES = (Priority.low.value, Priority.normal.value, Priority.high.value)
+
+DESCRIPTION_ERROR = "Beschreibung ist Pflicht und max. 100 Zeichen."
+
 class User(Base):
     __tablename__ = "users"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -58,8 +98,19 @@ class User(Base):
         back_populates="assignee", foreign_keys=lambda: Task.assignee_id
     )
 
+# Namen sind case-insensitiv eindeutig (Basis für das Anlegen per INSERT ... ON CONFLICT)
+Index("ux_users_name_lower", func.lower(User.name), unique=True)
+
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Filter/Sortierung der Taskliste (Status, von mir erstellt / an mich zugewiesen)
+        Index("ix_tasks_status_due", "status", "due_date", "priority", "created_at"),
+        Index("ix_tasks_creator_status", "creator_id", "status"),
+        # deckt auch die Kiosk-Abfrage ab (je Dringlichkeit: WHERE assignee_id, status, priority
+        # ORDER BY due_date, created_at LIMIT n -> Präfix-Scan je Bucket)
+        Index("ix_tasks_assignee_status_prio_due", "assignee_id", "status", "priority", "due_date", "created_at"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
     description: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -74,28 +125,91 @@ class Task(Base):
     creator: Mapped[User] = relationship(back_populates="created_tasks", foreign_keys=[creator_id])
     assignee: Mapped[User] = relationship(back_populates="assigned_tasks", foreign_keys=[assignee_id])
 
-    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Zeitstempel setzt SQLite selbst (UTC, ms-genau); default= zusätzlich für Bestands-DBs ohne DEFAULT
+    created_at: Mapped[datetime] = mapped_column(default=SQL_NOW, server_default=SQL_NOW)
+    updated_at: Mapped[datetime] = mapped_column(default=SQL_NOW, server_default=SQL_NOW, onupdate=SQL_NOW)
+
+    # Nur per with_expression() geladen: gekürzte Details für die Listenansicht
+    details_snippet: Mapped[Optional[str]] = query_expression()
+
+# Dringlichkeit bleibt als String gespeichert (Kiosk + Bestands-DBs), sortiert wird nach Rang:
+# lexikographisch wäre "normal" > "niedrig" > "hoch"
+PRIORITY_RANK = {Priority.low.value: 0, Priority.normal.value: 1, Priority.high.value: 2}
+task_priority_rank = case(PRIORITY_RANK, value=Task.priority, else_=PRIORITY_RANK[Priority.normal.value])
 
 # DB anlegen (nur hier)
 Base.metadata.create_all(engine)
+# create_all legt Indexe nur mit neuen Tabellen an -> in bestehenden DBs nachziehen
+with engine.begin() as _conn:
+    for _table in Base.metadata.sorted_tables:
+        for _ix in _table.indexes:
+            _conn.execute(CreateIndex(_ix, if_not_exists=True))
 
 # ----------------------------------------------------------------------------
 # Helpers
 # ----------------------------------------------------------------------------
+SessionLocal = sessionmaker(engine, expire_on_commit=False)
+
 def get_db() -> Session:
-    return Session(engine)
+    # Eine Session pro Request (im App-Kontext), wird in close_db geschlossen
+    if "db" not in g:
+        g.db = SessionLocal()
+    return g.db
+
+@app.teardown_appcontext
+def close_db(exc: Optional[BaseException]) -> None:
+    db = g.pop("db", None)
+    if db is not None:
+        db.close()
 
 def current_user(db: Session) -> Optional[User]:
-    uid = session.get("user_id")
-    return db.get(User, uid) if uid else None
+    # pro Request nur einmal laden (require_user + View teilen sich das Ergebnis)
+    if "user" not in g:
+        uid = session.get("user_id")
+        g.user = db.get(User, uid) if uid else None
+    return g.user
+
+def tasks_signature(db: Session) -> tuple:
+    # ändert sich bei jedem Insert/Update (max updated_at) und Delete (count)
+    return tuple(db.execute(select(func.count(Task.id), func.max(Task.updated_at))).one())
+
+# Fragment-Cache für den Tabellen-Body der Taskliste (pro Prozess, kurze TTL)
+ROWS_CACHE_TTL = 60
+ROWS_CACHE_MAX = 256
+_rows_cache: dict[tuple, tuple[float, Markup]] = {}
+
+# Benutzerliste (id, name) für Auswahlfelder; Benutzer werden nur angelegt, nie umbenannt
+# oder gelöscht -> (Anzahl, max. ID) erkennt jede Änderung
+_users_cache: tuple[tuple, list] = ((), [])
+
+def all_users(db: Session) -> list:
+    global _users_cache
+    sig = tuple(db.execute(select(func.count(User.id), func.max(User.id))).one())
+    if _users_cache[0] != sig:
+        _users_cache = (sig, db.execute(select(User.id, User.name).order_by(User.name)).all())
+    return _users_cache[1]
+
+_URL_ID = 987654321
+
+def url_parts(endpoint: str) -> tuple[str, str]:
+    # URL einmal mit Platzhalter-ID bauen; pro Zeile nur noch prefix + id + suffix
+    prefix, _, suffix = url_for(endpoint, task_id=_URL_ID).partition(str(_URL_ID))
+    return prefix, suffix
+
+def wants_json() -> bool:
+    # Task-Formular sendet per fetch() mit Accept: application/json
+    return request.accept_mimetypes.best_match(["text/html", "application/json"]) == "application/json"
+
+def form_done(endpoint: str):
+    # fetch()-Formulare bekommen das Ziel als JSON, ohne JS klassischer Redirect
+    url = url_for(endpoint)
+    return jsonify(redirect=url) if wants_json() else redirect(url)
 
 def require_user(fn):
     def wrapper(*args, **kwargs):
-        with get_db() as db:
-            if not current_user(db):
-                flash("Bitte zuerst Benutzer wählen oder anlegen.", "warning")
-                return redirect(url_for("select_user"))
+        if not current_user(get_db()):
+            flash("Bitte zuerst Benutzer wählen oder anlegen.", "warning")
+            return redirect(url_for("select_user"))
         return fn(*args, **kwargs)
     wrapper.__name__ = fn.__name__
     return wrapper
@@ -110,7 +224,8 @@ def root():
 
 @app.route("/favicon.ico")
 def favicon():
-    return Response(status=204)
+    # base.html verweist auf ein leeres data:-Icon; falls doch angefragt: lange cachen
+    return Response(status=204, headers={"Cache-Control": "public, max-age=31536000, immutable"})
 
 # ----------------------------------------------------------------------------
 # Benutzer
@@ -132,18 +247,18 @@ def select_user():
                 if not name:
                     flash("Name darf nicht leer sein.", "danger")
                 else:
-                    existing = db.scalar(select(User).where(func.lower(User.name) == name.lower()))
-                    if existing:
+                    # Ein Statement statt Prüfen + Einfügen; kein Ergebnis -> Name existiert schon
+                    stmt = sqlite_insert(User).values(name=name).on_conflict_do_nothing().returning(User.id)
+                    row = db.execute(stmt).first()
+                    if row is None:
                         flash("Name existiert bereits.", "danger")
                     else:
-                        user = User(name=name)
-                        db.add(user)
                         db.commit()
-                        session["user_id"] = user.id
+                        session["user_id"] = row.id
                         flash("Benutzer angelegt und angemeldet.", "success")
                         return redirect(url_for("list_tasks"))
-        users = db.scalars(select(User).order_by(User.name)).all()
-        return render_template("select_user.html", users=users)
+        users = all_users(db)
+        return render("select_user.html", users=users)
 
 @app.route("/logout")
 def logout():
@@ -162,40 +277,82 @@ def list_tasks():
         status = request.args.get("status")
         mine = request.args.get("mine")
 
-        q = select(Task).order_by(
-            Task.due_date.is_(None), Task.due_date, Task.priority.desc(), Task.created_at.desc()
-        )
-        if status in {Status.open.value, Status.done.value, Status.discarded.value}:
-            q = q.where(Task.status == status)
-        if mine == "created":
-            q = q.where(Task.creator_id == me.id)
-        elif mine == "assigned":
-            q = q.where(Task.assignee_id == me.id)
-
-        tasks = db.scalars(q).all()
-        users = db.scalars(select(User).order_by(User.name)).all()
-        return render_template("tasks_list.html", tasks=tasks, users=users, me=me, Status=Status, Priority=Priority)
+        if status not in STATUS_VALUES:
+            status = ""
+        if mine not in ("created", "assigned"):
+            mine = ""
+
+        # Seite ist reine Funktion aus (Benutzer, Filter, Datenstand) -> bedingter GET per ETag.
+        # Offene Flash-Meldungen müssen gerendert werden, dann kein 304.
+        sig = tasks_signature(db)
+        etag = hashlib.blake2b(f"{TEMPLATES_VERSION}|{me.id}|{status}|{mine}|{sig}".encode(), digest_size=12).hexdigest()
+        if "_flashes" not in session and request.if_none_match.contains(etag):
+            resp = Response(status=304)
+            resp.set_etag(etag)
+            return resp
+
+        # Tabellen-Body aus dem Cache, solange sich an den Tasks nichts geändert hat
+        key = (me.id, status, mine, sig)
+        now = time.monotonic()
+        hit = _rows_cache.get(key)
+        if hit and hit[0] > now:
+            rows_html = hit[1]
+        else:
+            # Nur die angezeigten Spalten laden; Details gekürzt (truncate(120) braucht max. 126 Zeichen).
+            # Ersteller/Zugewiesen gesammelt nachladen (kein N+1), alles andere darf nicht lazy laden
+            q = select(Task).options(
+                load_only(Task.id, Task.description, Task.due_date, Task.priority, Task.status,
+                          Task.creator_id, Task.assignee_id),
+                with_expression(Task.details_snippet, func.substr(Task.details, 1, 126)),
+                selectinload(Task.creator).load_only(User.id, User.name),
+                selectinload(Task.assignee).load_only(User.id, User.name),
+                raiseload("*"),
+            ).order_by(
+                Task.due_date.is_(None), Task.due_date, task_priority_rank.desc(), Task.created_at.desc()
+            )
+            if status:
+                q = q.where(Task.status == status)
+            if mine == "created":
+                q = q.where(Task.creator_id == me.id)
+            elif mine == "assigned":
+                q = q.where(Task.assignee_id == me.id)
+
+            tasks = db.scalars(q).all()
+            rows_html = Markup(render("tasks_rows.html", tasks=tasks,
+                                      edit_url=url_parts("edit_task"),
+                                      status_url=url_parts("change_status"),
+                                      delete_url=url_parts("delete_task")))
+            if len(_rows_cache) >= ROWS_CACHE_MAX:
+                _rows_cache.clear()
+            _rows_cache[key] = (now + ROWS_CACHE_TTL, rows_html)
+
+        resp = Response(render("tasks_list.html", rows_html=rows_html, me=me))
+        resp.set_etag(etag)
+        resp.cache_control.private = True
+        resp.cache_control.no_cache = True
+        return resp
 
 @app.route("/tasks/new", methods=["GET", "POST"])
 @require_user
 def create_task():
     with get_db() as db:
         me = current_user(db)
-        users = db.scalars(select(User).order_by(User.name)).all()
         if request.method == "POST":
             description = (request.form.get("description") or "").strip()
             if len(description) == 0 or len(description) > 100:
-                flash("Beschreibung ist Pflicht und max. 100 Zeichen.", "danger")
-                return render_template("task_form.html", users=users, me=me, task=None, Priority=Priority, Status=Status)
+                if wants_json():
+                    return jsonify(errors={"description": DESCRIPTION_ERROR}), 422
+                flash(DESCRIPTION_ERROR, "danger")
+                return render("task_form.html", users=all_users(db), me=me, task=None)
 
             due = request.form.get("due_date") or None
             due_date_val = datetime.strptime(due, "%Y-%m-%d").date() if due else None
             priority = request.form.get("priority") or Priority.normal.value
-            if priority not in [p.value for p in Priority]:
+            if priority not in PRIORITY_VALUES:
                 priority = Priority.normal.value
             details = request.form.get("details") or ""
             status = request.form.get("status") or Status.open.value
-            if status not in [s.value for s in Status]:
+            if status not in STATUS_VALUES:
                 status = Status.open.value
 
             assignee_id = int(request.form.get("assignee_id") or me.id)
@@ -214,8 +371,8 @@ def create_task():
             db.add(task)
             db.commit()
             flash("Aufgabe erstellt.", "success")
-            return redirect(url_for("list_tasks"))
-        return render_template("task_form.html", users=users, me=me, task=None, Priority=Priority, Status=Status)
+            return form_done("list_tasks")
+        return render("task_form.html", users=all_users(db), me=me, task=None)
 
 @app.route("/tasks/<int:task_id>/edit", methods=["GET", "POST"])
 @require_user
@@ -225,25 +382,26 @@ def edit_task(task_id: int):
         task = db.get(Task, task_id)
         if not task:
             flash("Aufgabe nicht gefunden.", "danger")
-            return redirect(url_for("list_tasks"))
-        users = db.scalars(select(User).order_by(User.name)).all()
+            return form_done("list_tasks")
         if request.method == "POST__":
             pass  # dummy (wird überschrieben)
 
         if request.method == "POST":
             description = (request.form.get("description") or "").strip()
             if len(description) == 0 or len(description) > 100:
-                flash("Beschreibung ist Pflicht und max. 100 Zeichen.", "danger")
-                return render_template("task_form.html", users=users, me=me, task=task, Priority=Priority, Status=Status)
+                if wants_json():
+                    return jsonify(errors={"description": DESCRIPTION_ERROR}), 422
+                flash(DESCRIPTION_ERROR, "danger")
+                return render("task_form.html", users=all_users(db), me=me, task=task)
 
             due = request.form.get("due_date") or None
             task.due_date = datetime.strptime(due, "%Y-%m-%d").date() if due else None
             priority = request.form.get("priority") or Priority.normal.value
-            if priority in [p.value for p in Priority]:
+            if priority in PRIORITY_VALUES:
                 task.priority = priority
             task.details = request.form.get("details") or ""
             status = request.form.get("status") or Status.open.value
-            if status in [s.value for s in Status]:
+            if status in STATUS_VALUES:
                 task.status = status
             assignee_id = int(request.form.get("assignee_id") or me.id)
             if db.get(User, assignee_id):
@@ -251,35 +409,40 @@ def edit_task(task_id: int):
 
             db.commit()
             flash("Aufgabe aktualisiert.", "success")
-            return redirect(url_for("list_tasks"))
+            return form_done("list_tasks")
 
-        return render_template("task_form.html", users=users, me=me, task=task, Priority=Priority, Status=Status)
+        return render("task_form.html", users=all_users(db), me=me, task=task)
 
 @app.route("/tasks/<int:task_id>/status", methods=["POST"])
 @require_user
 def change_status(task_id: int):
+    new_status = request.form.get("status")
+    if new_status not in STATUS_VALUES:
+        flash("Ungültiger Status.", "danger")
+        return redirect(url_for("list_tasks"))
     with get_db() as db:
-        task = db.get(Task, task_id)
-        if not task:
-            flash("Aufgabe nicht gefunden.", "danger")
+        # direktes UPDATE statt Laden + Ändern; rowcount 0 -> Task existiert nicht
+        res = db.execute(
+            update(Task).where(Task.id == task_id).values(status=new_status),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        if res.rowcount:
+            flash("Status geändert.", "success")
         else:
-            new_status = request.form.get("status")
-            if new_status in [s.value for s in Status]:
-                task.status = new_status
-                db.commit()
-                flash("Status geändert.", "success")
-            else:
-                flash("Ungültiger Status.", "danger")
+            flash("Aufgabe nicht gefunden.", "danger")
     return redirect(url_for("list_tasks"))
 
 @app.route("/tasks/<int:task_id>/delete", methods=["POST"])
 @require_user
 def delete_task(task_id: int):
     with get_db() as db:
-        task = db.get(Task, task_id)
-        if task:
-            db.delete(task)
-            db.commit()
+        res = db.execute(
+            delete(Task).where(Task.id == task_id),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        if res.rowcount:
             flash("Aufgabe gelöscht.", "info")
         else:
             flash("Aufgabe nicht gefunden.", "danger")
@@ -296,6 +459,7 @@ TEMPLATES = {
   <meta charset="utf-8">
   <meta name="viewport" content="width=device-width, initial-scale=1">
   <title>Reminder</title>
+  <link rel="icon" href="data:,">
   <link rel="stylesheet" href="https://unpkg.com/@picocss/pico@2/css/pico.min.css">
   <style>
     .status-Offen { background:#fff3cd; }
@@ -363,7 +527,7 @@ TEMPLATES = {
   <label>Status
     <select name="status">
       <option value="">Alle</option>
-      {% for s in [Status.open.value, Status.done.value, Status.discarded.value] %}
+      {% for s in STATUS_CHOICES %}
         <option value="{{ s }}" {% if request.args.get('status')==s %}selected{% endif %}>{{ s }}</option>
       {% endfor %}
     </select>
@@ -385,46 +549,48 @@ TEMPLATES = {
       <th>Ersteller</th><th>Zugewiesen</th><th></th>
     </tr>
   </thead>
-  <tbody>
-    {% for t in tasks %}
-    <tr class="status-{{ t.status }}">
-      <td><strong><a href="{{ url_for('edit_task', task_id=t.id) }}">{{ t.description }}</a></strong><br>
-          <small>{{ t.details|truncate(120) }}</small></td>
-      <td>{% if t.due_date %}{{ t.due_date.isoformat() }}{% else %}-{% endif %}</td>
-      <td>
-        {% if t.priority == 'hoch' %}<span class="badge">hoch</span>{% endif %}
-        {% if t.priority == 'normal' %}<span class="badge">normal</span>{% endif %}
-        {% if t.priority == 'niedrig' %}<span class="badge">niedrig</span>{% endif %}
-      </td>
-      <td>{{ t.status }}</td>
-      <td>{{ t.creator.name }}</td>
-      <td>{{ t.assignee.name }}</td>
-      <td>
-        <form method="post" action="{{ url_for('change_status', task_id=t.id) }}" style="display:inline">
-          <select name="status">
-            {% for s in [Status.open.value, Status.done.value, Status.discarded.value] %}
-              <option value="{{ s }}" {% if t.status==s %}selected{% endif %}>{{ s }}</option>
-            {% endfor %}
-          </select>
-          <button type="submit">OK</button>
-        </form>
-        <form method="post" action="{{ url_for('delete_task', task_id=t.id) }}" style="display:inline" onsubmit="return confirm('Wirklich löschen?')">
-          <button type="submit" class="contrast">Löschen</button>
-        </form>
-      </td>
-    </tr>
-    {% else %}
-    <tr><td colspan="7">Keine Aufgaben gefunden.</td></tr>
-    {% endfor %}
-  </tbody>
+  <tbody>{{ rows_html }}</tbody>
 </table>
 {% endblock %}
 """,
+"tasks_rows.html": r"""
+{% for t in tasks %}
+<tr class="status-{{ t.status }}">
+  <td><strong><a href="{{ edit_url[0] }}{{ t.id }}{{ edit_url[1] }}">{{ t.description }}</a></strong><br>
+      <small>{{ t.details_snippet|truncate(120) }}</small></td>
+  <td>{% if t.due_date %}{{ t.due_date.isoformat() }}{% else %}-{% endif %}</td>
+  <td>
+    {% if t.priority == 'hoch' %}<span class="badge">hoch</span>{% endif %}
+    {% if t.priority == 'normal' %}<span class="badge">normal</span>{% endif %}
+    {% if t.priority == 'niedrig' %}<span class="badge">niedrig</span>{% endif %}
+  </td>
+  <td>{{ t.status }}</td>
+  <td>{{ t.creator.name }}</td>
+  <td>{{ t.assignee.name }}</td>
+  <td>
+    <form method="post" action="{{ status_url[0] }}{{ t.id }}{{ status_url[1] }}" style="display:inline">
+      <select name="status">
+        {% for s in STATUS_CHOICES %}
+          <option value="{{ s }}" {% if t.status==s %}selected{% endif %}>{{ s }}</option>
+        {% endfor %}
+      </select>
+      <button type="submit">OK</button>
+    </form>
+    <form method="post" action="{{ delete_url[0] }}{{ t.id }}{{ delete_url[1] }}" style="display:inline" onsubmit="return confirm('Wirklich löschen?')">
+      <button type="submit" class="contrast">Löschen</button>
+    </form>
+  </td>
+</tr>
+{% else %}
+<tr><td colspan="7">Keine Aufgaben gefunden.</td></tr>
+{% endfor %}
+""",
 "task_form.html": r"""
 {% extends 'base.html' %}
 {% block content %}
 <h2>{% if task %}Aufgabe bearbeiten{% else %}Neue Aufgabe{% endif %}</h2>
-<form method="post" class="grid">
+<article id="form_errors" class="danger" hidden></article>
+<form method="post" class="grid" id="task_form">
   <label>Beschreibung (max. 100 Zeichen)
     <input name="description" maxlength="100" value="{{ task.description if task else '' }}" required>
   </label>
@@ -433,14 +599,14 @@ TEMPLATES = {
   </label>
   <label>Dringlichkeit
     <select name="priority">
-      {% for p in ['niedrig','normal','hoch'] %}
+      {% for p in PRIORITY_CHOICES %}
         <option value="{{ p }}" {% if task and task.priority==p %}selected{% endif %}>{{ p }}</option>
       {% endfor %}
     </select>
   </label>
   <label>Status
     <select name="status">
-      {% for s in [Status.open.value, Status.done.value, Status.discarded.value] %}
+      {% for s in STATUS_CHOICES %}
         <option value="{{ s }}" {% if task and task.status==s %}selected{% endif %}>{{ s }}</option>
       {% endfor %}
     </select>
@@ -460,10 +626,40 @@ TEMPLATES = {
     <a href="{{ url_for('list_tasks') }}" role="button" class="secondary">Abbrechen</a>
   </div>
 </form>
+<script>
+  // Absenden per fetch(): Validierungsfehler kommen als JSON (422), die Seite bleibt stehen
+  document.getElementById('task_form').addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const form = e.target;
+    try {
+      const r = await fetch(window.location.href, {
+        method: 'POST', body: new FormData(form), headers: {'Accept': 'application/json'}
+      });
+      const data = await r.json();
+      if (r.ok) { window.location.href = data.redirect; return; }
+      const box = document.getElementById('form_errors');
+      box.textContent = Object.values(data.errors || {}).join(' ');
+      box.hidden = false;
+    } catch (err) {
+      form.submit();  // Fallback: klassischer POST
+    }
+  });
+</script>
 {% endblock %}
 """
 }
 app.jinja_loader = DictLoader(TEMPLATES)
+app.jinja_env.globals.update(STATUS_CHOICES=STATUS_CHOICES, PRIORITY_CHOICES=PRIORITY_CHOICES)
+
+# Templates einmalig beim Import kompilieren (kein Loader-Lookup/uptodate-Check pro Request)
+COMPILED = {name: app.jinja_env.get_template(name) for name in TEMPLATES}
+# Inhalts-Hash der Templates: geht in den ETag ein, damit nach einem Deployment kein 304 mit altem Markup kommt
+TEMPLATES_VERSION = hashlib.blake2b("".join(TEMPLATES.values()).encode(), digest_size=6).hexdigest()
+
+def render(name: str, **ctx) -> str:
+    # wie render_template: request/session/g + Context-Processors ergänzen
+    app.update_template_context(ctx)
+    return COMPILED[name].render(ctx)
 
 # ----------------------------------------------------------------------------
 # Dev-Seed (optional)
@@ -472,14 +668,18 @@ app.jinja_loader = DictLoader(TEMPLATES)
 def seed():
     with get_db() as db:
         if not db.scalar(select(User)):
-            alice = User(name="Alice")
-            bob = User(name="Bob")
-            db.add_all([alice, bob]); db.commit()
-            t1 = Task(description="Müll rausbringen", due_date=date.today(), priority=Priority.normal.value,
-                      details="Gelber Sack.", status=Status.open.value, creator_id=alice.id, assignee_id=bob.id)
-            t2 = Task(description="Wocheneinkauf", priority=Priority.high.value,
-                      details="Liste am Kühlschrank.", status=Status.open.value, creator_id=bob.id, assignee_id=alice.id)
-            db.add_all([t1, t2]); db.commit()
+            # Mehrzeilige INSERTs (insertmanyvalues) statt ORM-Unit-of-Work pro Zeile
+            alice_id, bob_id = db.scalars(
+                insert(User).returning(User.id, sort_by_parameter_order=True),
+                [{"name": "Alice"}, {"name": "Bob"}],
+            ).all()
+            db.execute(insert(Task), [
+                dict(description="Müll rausbringen", due_date=date.today(), priority=Priority.normal.value,
+                     details="Gelber Sack.", status=Status.open.value, creator_id=alice_id, assignee_id=bob_id),
+                dict(description="Wocheneinkauf", due_date=None, priority=Priority.high.value,
+                     details="Liste am Kühlschrank.", status=Status.open.value, creator_id=bob_id, assignee_id=alice_id),
+            ])
+            db.commit()
             print("Seed-Daten angelegt.")
         else:
             print("Benutzer/Tasks existieren bereits – nichts zu tun.")
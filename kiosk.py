@@ -12,24 +12,27 @@ Features:
    3) 4× normal   (inkl. Vergangenheit & undatiert)
    4) 4× niedrig  (inkl. Vergangenheit & undatiert)
 • Bestätigungsdialog für Erledigt/Verwerfen
-• Auto-Refresh (pausiert im Dialog); Override per ?refresh=NN; kleiner Jitter
+• Auto-Refresh per JSON-Polling auf /kiosk/<NAME>/state (pausiert im Dialog); Override per ?refresh=NN; kleiner Jitter
 • Modebar oben rechts (klickbar: Minimal „Ansicht X“ <-> Mehrzeilig-Detail), Zustand in localStorage
 • iFrame-freundlich: SQLite check_same_thread=False, No-Cache-Header, threaded Server
+• Bedingter GET: ETag aus Benutzer/Ansicht/Datenstand -> Auto-Refresh meist nur 304
 Env:
   REMINDER_DB, REMINDER_SECRET, KIOSK_DEFAULT_USER, KIOSK_REFRESH_SECONDS
 """
 
 from __future__ import annotations
-from datetime import date, datetime, time
+from datetime import date, datetime, time, timedelta
 from enum import Enum
 from typing import Optional
-from collections import Counter
-import os, math
+from functools import lru_cache
+import base64, gzip, hashlib, os, math
+from time import monotonic
 
-from flask import Flask, render_template, request, redirect, url_for, session, Response
+from flask import Flask, g, request, redirect, url_for, session, Response
 from jinja2 import DictLoader
-from sqlalchemy import create_engine, ForeignKey, select, func
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, Session, relationship
+import orjson
+from sqlalchemy import create_engine, event, ForeignKey, Index, Row, literal, select, union_all, update, func
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, Session, relationship, sessionmaker
 from sqlalchemy.types import String, Text, Date
 
 # ----------------------------------------------------------------------------
@@ -41,18 +44,38 @@ DEFAULT_KIOSK_USER = os.environ.get("KIOSK_DEFAULT_USER")              # optiona
 REFRESH_SECONDS_DEFAULT = int(os.environ.get("KIOSK_REFRESH_SECONDS", "30"))
 
 app = Flask(__name__)
-app.config.update(SECRET_KEY=SECRET_KEY, SEND_FILE_MAX_AGE_DEFAULT=0)
+# Statische Assets (kiosk.css/kiosk.js) sind per ?v=<Hash> versioniert -> dürfen ein Jahr gecacht werden
+app.config.update(SECRET_KEY=SECRET_KEY, SEND_FILE_MAX_AGE_DEFAULT=31536000, TEMPLATES_AUTO_RELOAD=False)
 
 # SQLite Engine: iFrame/Parallelzugriffe -> Threading erlauben
 engine = create_engine(
     f"sqlite:///{DB_PATH}",
     echo=False,
     future=True,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    pool_size=5,
+    max_overflow=10,
+    pool_pre_ping=True,
 )
 
+# WAL: Polling-Leser blockieren kiosk_action (Schreiber) nicht, Commits ohne vollen fsync
+@event.listens_for(engine, "connect")
+def _sqlite_pragmas(dbapi_con, _):
+    cur = dbapi_con.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA busy_timeout=5000")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA cache_size=-20000")     # ~20 MB Page-Cache je Verbindung
+    cur.execute("PRAGMA mmap_size=67108864")    # Lesezugriffe per mmap (64 MB)
+    cur.close()
+
 class Base(DeclarativeBase): pass
 
+# Aktuelle UTC-Zeit als SQL-Ausdruck mit Millisekunden – gleiches Format wie die Main-App,
+# damit max(updated_at) im ETag-Datenstand über beide Apps vergleichbar bleibt
+SQL_NOW = func.strftime("%Y-%m-%d %H:%M:%f", "now")
+
 # ----------------------------------------------------------------------------
 # Modelle (Strings müssen zur Main-App passen)
 # ----------------------------------------------------------------------------
@@ -71,8 +94,15 @@ class User(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
 
+# Funktionsindex für _ci_name (lower(name) = ?) – wie die Tabellen von der Main-App angelegt
+Index("ux_users_name_lower", func.lower(User.name), unique=True)
+
 class Task(Base):
     __tablename__ = "tasks"
+    # Index für die Kiosk-Abfrage; angelegt wird er (wie die Tabellen) von der Main-App
+    __table_args__ = (
+        Index("ix_tasks_assignee_status_prio_due", "assignee_id", "status", "priority", "due_date", "created_at"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     description: Mapped[str] = mapped_column(String(100), nullable=False)
     due_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
@@ -81,23 +111,97 @@ class Task(Base):
     status: Mapped[str] = mapped_column(String(10), default=Status.open.value, nullable=False)
     creator_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     assignee_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    creator = relationship("User", foreign_keys=[creator_id])
-    assignee = relationship("User", foreign_keys=[assignee_id])
-    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
-
-def get_db() -> Session: return Session(engine)
-def _ci_name(db: Session, name: str) -> Optional[User]:
-    return db.scalar(select(User).where(func.lower(User.name) == (name or "").strip().lower()))
-
-# No-Cache für iFrames / Reload-Sauberkeit
+    # Kiosk greift nie auf die Beziehungen zu -> versehentliches Lazy-Load (N+1) soll laut scheitern
+    creator = relationship("User", foreign_keys=[creator_id], lazy="raise")
+    assignee = relationship("User", foreign_keys=[assignee_id], lazy="raise")
+    # Zeitstempel setzt SQLite selbst (UTC, ms-genau, wie in der Main-App)
+    created_at: Mapped[datetime] = mapped_column(default=SQL_NOW, server_default=SQL_NOW)
+    updated_at: Mapped[datetime] = mapped_column(default=SQL_NOW, server_default=SQL_NOW, onupdate=SQL_NOW)
+
+SessionLocal = sessionmaker(engine, expire_on_commit=False)
+
+def get_db() -> Session:
+    # Eine Session pro Request (im App-Kontext), wird in close_db geschlossen
+    if "db" not in g:
+        g.db = SessionLocal()
+    return g.db
+
+@app.teardown_appcontext
+def close_db(exc: Optional[BaseException]) -> None:
+    db = g.pop("db", None)
+    if db is not None:
+        db.close()
+
+# Name -> (id, name) für einige Sekunden merken; Benutzer werden nur angelegt, nie umbenannt.
+# Gecacht werden Rows statt ORM-Objekten (die wären nach dem Request detached).
+USER_CACHE_TTL = 60
+USER_CACHE_MAX = 256
+_user_cache: dict[str, tuple[float, Row]] = {}
+
+def _ci_name(db: Session, name: str) -> Optional[Row]:
+    key = (name or "").strip().lower()
+    now = monotonic()
+    hit = _user_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    row = db.execute(select(User.id, User.name).where(func.lower(User.name) == key)).first()
+    if row is not None:  # Unbekannte Namen nicht cachen (könnten gleich angelegt werden)
+        if len(_user_cache) >= USER_CACHE_MAX:
+            _user_cache.clear()
+        _user_cache[key] = (now + USER_CACHE_TTL, row)
+    return row
+
+
+# No-Cache für iFrames / Reload-Sauberkeit (statische Assets und Favicon ausgenommen)
 @app.after_request
 def add_no_cache_headers(resp):
+    if request.endpoint in ("static", "favicon"):
+        resp.cache_control.public = True
+        resp.cache_control.immutable = True
+        return resp
+    if resp.get_etag()[0]:
+        # Antworten mit ETag dürfen gespeichert werden, werden aber immer revalidiert (304)
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp
     resp.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
     resp.headers["Pragma"] = "no-cache"
     resp.headers["Expires"] = "0"
     return resp
 
+# gzip für HTML/JSON; kiosk.css/kiosk.js werden nur einmal komprimiert und dann aus dem Speicher
+# ausgeliefert (ändern sich nur mit einem Deployment, ASSET_VERSION gilt ebenso bis zum Neustart)
+COMPRESS_MIMETYPES = {"text/html", "application/json", "text/css", "text/javascript"}
+COMPRESS_MIN_SIZE = 500
+_gzip_static: dict[str, bytes] = {}
+
+@app.after_request
+def gzip_response(resp):
+    resp.vary.add("Accept-Encoding")
+    if (resp.status_code != 200
+            or resp.mimetype not in COMPRESS_MIMETYPES
+            or "Content-Encoding" in resp.headers
+            or "gzip" not in request.headers.get("Accept-Encoding", "")):
+        return resp
+    if request.endpoint == "static":
+        filename = request.view_args["filename"]
+        data = _gzip_static.get(filename)
+        if data is None:
+            resp.direct_passthrough = False
+            data = _gzip_static[filename] = gzip.compress(resp.get_data(), compresslevel=9)
+        if hasattr(resp.response, "close"):
+            resp.response.close()  # Datei-Wrapper von send_file schließen, Inhalt kommt aus dem Cache
+    elif resp.direct_passthrough:
+        return resp
+    else:
+        data = resp.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return resp
+        data = gzip.compress(data, compresslevel=6)
+    resp.direct_passthrough = False
+    resp.set_data(data)
+    resp.headers["Content-Encoding"] = "gzip"
+    return resp
+
 # ----------------------------------------------------------------------------
 # Templates (inline via DictLoader)
 # ----------------------------------------------------------------------------
@@ -109,81 +213,10 @@ TEMPLATES = {
 <meta charset="utf-8">
 <meta name="viewport" content="width=480, height=320, initial-scale=1, maximum-scale=1, user-scalable=no">
 <title>Kiosk</title>
-<style>
-  :root{
-    --bg:#0c0e12; --fg:#e8eaf0; --muted:#9aa3b2; --accent:#5aa2ff;
-    --pad:6px; --fs-xs:10px; --fs-m:14px; --touch:40px;
-
-    /* Hoch – Tag amber (nicht rot), Karte rötlich */
-    --hi-tag:#f59e0b;   --hi-tag-border:#b45309; --hi-tag-text:#000;
-    --hi-bg:#3b2020;    --hi-border:#692a2a;
-
-    /* Normal (Blau) */
-    --nm-tag:#264ea6;   --nm-bg:#1a2646;   --nm-border:#273b78;
-
-    /* Niedrig (Teal/Grün) */
-    --lo-tag:#0c6e56;   --lo-bg:#122e27;   --lo-border:#1f4a40;
-
-    /* Überfällig (Rot) */
-    --ov-tag:#b91c1c;   --ov-border:#8a1313;
-
-    /* Zeitwarnung */
-    --hrs-warn:#ff6b6b;
-  }
-
-  *{box-sizing:border-box}
-  html,body{margin:0;height:100%;background:var(--bg);color:var(--fg);
-            font-family: system-ui,-apple-system,Segoe UI,Roboto,Arial,sans-serif;}
-  .app{display:flex;width:100vw;height:100vh}
-  .left{flex:2;padding:var(--pad)}
-  .right{flex:1;padding:var(--pad);border-left:1px solid #0e1220;display:flex;flex-direction:column;gap:6px}
-
-  .task{display:grid;grid-template-columns:1fr;gap:2px;align-items:center;
-        padding:6px;margin-bottom:4px;border-radius:8px;min-height:var(--touch);cursor:pointer;}
-  .hdr{display:flex;align-items:center;justify-content:space-between;gap:6px}
-  .desc{font-size:var(--fs-m);font-weight:700;white-space:nowrap;overflow:hidden;text-overflow:ellipsis;max-width:200px}
-  .tags{display:flex;gap:4px}
-  .due{font-size:var(--fs-xs); color:var(--muted)}
-  .due .timebreak.soon{ color:var(--hrs-warn); font-weight:800; }
-  .tag{font-size:var(--fs-xs);padding:2px 6px;border-radius:999px;color:#fff;border:1px solid transparent}
-
-  .task.high   { background:var(--hi-bg); border:1px solid var(--hi-border); }
-  .task.normal { background:var(--nm-bg); border:1px solid var(--nm-border); }
-  .task.low    { background:var(--lo-bg); border:1px solid var(--lo-border); }
-
-  .tag.high   { background:var(--hi-tag);   border-color:var(--hi-tag-border); color:var(--hi-tag-text); }
-  .tag.normal { background:var(--nm-tag);   border-color:#1f3e85; }
-  .tag.low    { background:var(--lo-tag);   border-color:#0a5746; }
-  .tag.overdue{ background:var(--ov-tag);   border-color:var(--ov-border); }
-
-  .sel{outline:2px solid var(--accent); outline-offset:0}
-
-  .btn{width:100%;height:var(--touch);border-radius:10px;border:1px solid #2a344e;
-       font-weight:800;font-size:var(--fs-m);color:var(--fg);background:#1a2238}
-  .ok{background:#1d8f5a;border-color:#256e4c}
-  .bad{background:#9b3a2f;border-color:#7a2c25}
-  .alt{background:#28324f;border-color:#2c3a64}
-  .btn:active{transform:scale(.98)}
-
-  .empty{color:var(--muted);font-size:var(--fs-xs);text-align:center;padding:6px}
-
-  /* Modebar (klickbar), erlaubt Zeilenumbrüche in der Detailansicht */
-  .modebar{
-    font-size: var(--fs-xs);
-    color: var(--muted);
-    white-space: pre-line; /* \n -> sichtbare Zeilenumbrüche */
-    overflow: hidden;
-    text-overflow: ellipsis;
-    padding: 4px 6px;
-    border-radius: 6px;
-    border: 1px solid #2a344e;
-    background: #0f1422;
-    cursor: pointer;
-    user-select: none;
-  }
-</style>
+<link rel="stylesheet" href="{{ url_for('static', filename='kiosk.css', v=asset_version) }}">
 </head>
-<body>
+<body data-refresh-ms="{{ refresh_ms }}" data-state-url="{{ url_for('kiosk_state', name=user.name) }}"
+      data-state-etag="{{ state_etag }}" data-asset-version="{{ asset_version }}">
   <div class="app">
     <div class="left">{% block left %}{% endblock %}</div>
     <div class="right">{% block right %}{% endblock %}</div>
@@ -201,95 +234,7 @@ TEMPLATES = {
     </div>
   </div>
 
-<script>
-  // Auswahl-Logik
-  const selectTask = (id) => {
-    document.querySelectorAll('.task').forEach(el=>el.classList.remove('sel'));
-    const el=document.querySelector(`.task[data-id="${id}"]`);
-    if(el){el.classList.add('sel');}
-    const hidden=document.getElementById('selected_task_id');
-    if(hidden) hidden.value=id;
-  };
-
-  // Buttons & Confirm
-  let pendingAction = null;
-  const form         = document.getElementById('action_form');
-  const btnDone      = document.getElementById('btn_done');
-  const btnDiscard   = document.getElementById('btn_discard');
-  const btnCycle     = document.getElementById('btn_cycle');
-  const overlay      = document.getElementById('confirm_overlay');
-  const confirmText  = document.getElementById('confirm_text');
-  const confirmOk    = document.getElementById('confirm_ok');
-  const confirmCancel= document.getElementById('confirm_cancel');
-  const actionInput  = document.getElementById('action_input');
-
-  function openConfirm(action){
-    const id = document.getElementById('selected_task_id').value;
-    if(!id){ alert("Bitte zuerst eine Aufgabe auswählen."); return; }
-    pendingAction = action;
-    const el = document.querySelector(`.task[data-id="${id}"] .desc`);
-    const title = (action==='done' ? "Erledigt" : "Verwerfen");
-    confirmText.textContent = `${title} – „${el ? el.textContent : 'Ausgewählte Aufgabe'}“?`;
-    confirmOk.classList.remove('ok','bad','btn');
-    confirmOk.classList.add(action==='done' ? 'ok' : 'bad', 'btn');
-    overlay.style.display='flex';
-  }
-  function closeConfirm(){ overlay.style.display='none'; pendingAction=null; }
-
-  if(btnDone){    btnDone.addEventListener('click', ()=>openConfirm('done')); }
-  if(btnDiscard){ btnDiscard.addEventListener('click', ()=>openConfirm('discard')); }
-  if(btnCycle){   btnCycle.addEventListener('click', ()=>{ actionInput.value='cycle'; form.submit(); }); }
-
-  confirmCancel.addEventListener('click', closeConfirm);
-  confirmOk.addEventListener('click', ()=>{
-    if(!pendingAction) return;
-    actionInput.value=pendingAction;
-    closeConfirm();
-    form.submit();
-  });
-
-  // Erste Auswahl vornehmen
-  window.addEventListener('DOMContentLoaded',()=>{
-    const first=document.querySelector('.task');
-    if(first) selectTask(first.dataset.id);
-  });
-
-  // Modebar Toggle (Minimal <-> Mehrzeilig-Detail), Zustand in localStorage
-  function renderModebar(){
-    const el = document.getElementById('modebar');
-    if(!el) return;
-    const expanded = localStorage.getItem('modebarExpanded') === '1';
-    const minText  = el.dataset.min;   // "Ansicht X"
-    const fullText = el.dataset.full;  // "Ansicht X\n...Zähler...\nAktualisierung alle Ns"
-    el.textContent = expanded ? fullText : minText; // white-space:pre-line aktiv
-  }
-  window.addEventListener('DOMContentLoaded', ()=>{
-    const el = document.getElementById('modebar');
-    if(el){
-      renderModebar();
-      el.addEventListener('click', ()=>{
-        const expanded = localStorage.getItem('modebarExpanded') === '1';
-        localStorage.setItem('modebarExpanded', expanded ? '0' : '1');
-        renderModebar();
-      });
-    }
-  });
-
-  // Auto-Refresh (pausiert, wenn Confirm-Dialog offen ist) + kleiner Jitter
-  const REFRESH_MS = {{ refresh_ms }};
-  if (REFRESH_MS > 0) {
-    const jitter = Math.floor(Math.random()*500); // 0..499ms
-    setInterval(() => {
-      const ov = document.getElementById('confirm_overlay');
-      const isOpen = ov && getComputedStyle(ov).display !== 'none';
-      if (!isOpen) {
-        const url = new URL(window.location.href);
-        url.searchParams.set('_ts', Date.now().toString());
-        window.location.replace(url.toString());
-      }
-    }, REFRESH_MS + jitter);
-  }
-</script>
+<script src="{{ url_for('static', filename='kiosk.js', v=asset_version) }}"></script>
 </body>
 </html>
 """,
@@ -297,28 +242,24 @@ TEMPLATES = {
 "view.html": r"""
 {% extends 'base.html' %}
 {% block left %}
-  {% for t in tasks_to_show %}
-    {% set cls = 'high' if t.priority == 'hoch' else ('normal' if t.priority == 'normal' else 'low') %}
-    {% set overdue = (t.due_date is not none) and (t.due_date < today) %}
-    {% set hrs_total = hours_left_map.get(t.id) %}
-    {% set dh_text = dh_text_map.get(t.id) %}
-    <div class="task {{ cls }}" data-id="{{ t.id }}" onclick="selectTask('{{ t.id }}')">
+  {% for t in rows %}
+    <div class="task {{ t.cls }}" data-id="{{ t.id }}">
       <div class="hdr">
-        <div class="desc">{{ t.description }}</div>
+        <div class="desc">{{ t.desc }}</div>
         <div class="tags">
-          <div class="tag {{ cls }}">{{ t.priority }}</div>
-          {% if overdue %}<div class="tag overdue">Überfällig</div>{% endif %}
+          <div class="tag {{ t.cls }}">{{ t.prio }}</div>
+          {% if t.overdue %}<div class="tag overdue">Überfällig</div>{% endif %}
         </div>
       </div>
       <div class="due">
-        Fällig: {{ t.due_date.isoformat() if t.due_date else '–' }}
-        {% if hrs_total is not none %}
-          (<span class="timebreak {% if hrs_total < 24 %}soon{% endif %}">{{ dh_text }}</span>)
+        Fällig: {{ t.due or '–' }}
+        {% if t.hrs is not none %}
+          (<span class="timebreak {% if t.soon %}soon{% endif %}">{{ t.dh }}</span>)
         {% endif %}
       </div>
     </div>
   {% endfor %}
-  {% if not tasks_to_show %}<div class="empty">Keine offenen Aufgaben</div>{% endif %}
+  {% if not rows %}<div class="empty">Keine offenen Aufgaben</div>{% endif %}
 {% endblock %}
 
 {% block right %}
@@ -342,6 +283,28 @@ TEMPLATES = {
 }
 app.jinja_loader = DictLoader(TEMPLATES)
 
+def _asset_version() -> str:
+    # Inhalts-Hash der statischen Dateien und Inline-Templates als Cache-Buster: geht in die
+    # ETags ein, ändert sich also bei jedem Deployment, das CSS/JS oder das Markup ändert
+    h = hashlib.md5()
+    for fn in ("kiosk.css", "kiosk.js"):
+        with open(os.path.join(app.static_folder, fn), "rb") as f:
+            h.update(f.read())
+    for name in sorted(TEMPLATES):
+        h.update(TEMPLATES[name].encode())
+    return h.hexdigest()[:10]
+
+ASSET_VERSION = _asset_version()
+app.jinja_env.globals["asset_version"] = ASSET_VERSION
+
+# view.html (inkl. base.html) einmalig beim Import kompilieren, kein Loader-Lookup pro Refresh
+VIEW_TPL = app.jinja_env.get_template("view.html")
+
+def render_view(**ctx) -> str:
+    # wie render_template: request/session/g + Context-Processors ergänzen
+    app.update_template_context(ctx)
+    return VIEW_TPL.render(ctx)
+
 # ----------------------------------------------------------------------------
 # Komfort: Root & Favicon
 # ----------------------------------------------------------------------------
@@ -352,13 +315,145 @@ def root():
     return ("Kiosk läuft. Aufruf: /kiosk/<NAME> (z. B. /kiosk/Alice) – oder KIOSK_DEFAULT_USER setzen.",
             200, {"Content-Type": "text/plain; charset=utf-8"})
 
+# 1×1 transparentes PNG: Kiosk-Browser fragen das Favicon sonst immer wieder an
+FAVICON_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII=")
+
 @app.route("/favicon.ico")
 def favicon():
-    return Response(status=204)
+    resp = Response(FAVICON_PNG, mimetype="image/png")
+    resp.cache_control.max_age = 31536000
+    return resp
 
 # ----------------------------------------------------------------------------
 # Routen & Logik
 # ----------------------------------------------------------------------------
+def _data_version(db: Session) -> tuple:
+    # Datenstand (Anzahl + max. updated_at) und Stunde (Restzeit springt jeweils um hh:59:59)
+    count, last_mod = db.execute(select(func.count(Task.id), func.max(Task.updated_at))).one()
+    hour_key = (datetime.now() + timedelta(seconds=1)).strftime("%Y-%m-%d %H")
+    return count, last_mod, hour_key
+
+def _etag(*parts) -> str:
+    return hashlib.md5(":".join(map(str, parts)).encode()).hexdigest()
+
+def _state_etag(user_id: int, mode: int, version: tuple) -> str:
+    # ETag des JSON-Zustands; mit Asset-Version, damit laufende Kiosks nach einem Deployment
+    # kein 304 mehr bekommen, die neue asset_version sehen und neu laden
+    return _etag(user_id, mode, ASSET_VERSION, *version)
+
+def _not_modified(etag: str) -> Optional[Response]:
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+        resp.set_etag(etag)
+        return resp
+    return None
+
+# Ansicht -> {Dringlichkeit: max. Anzahl}, Reihenfolge = Anzeige-Reihenfolge
+MODE_CAPS = {
+    1: {Priority.high.value: 1, Priority.normal.value: 2, Priority.low.value: 1},
+    2: {Priority.high.value: 4},
+    3: {Priority.normal.value: 4},
+    4: {Priority.low.value: 4},
+}
+
+# Dringlichkeit -> CSS-Klasse der Karte/des Tags
+PRIO_CLASS = {Priority.high.value: "high", Priority.normal.value: "normal", Priority.low.value: "low"}
+
+# Zeit bis Ende des Fälligkeitstags (in Stunden)
+def hours_left_until_day_end(d: Optional[date], now_ts: float) -> Optional[int]:
+    if d is None: return None
+    due_ts = datetime.combine(d, time(23, 59, 59)).timestamp()
+    return math.floor((due_ts - now_ts) / 3600)
+
+# Darstellung "x Tag(e), y Stunde(n)" – wenige verschiedene Stundenwerte -> Ergebnisse cachen
+@lru_cache(maxsize=4096)
+def de_plural(n: int, singular: str, plural: str) -> str:
+    return singular if abs(n) == 1 else plural
+
+@lru_cache(maxsize=4096)
+def format_days_hours(total_hours: int) -> str:
+    sign = "-" if total_hours < 0 else ""
+    ah = abs(total_hours)
+    days, hours = divmod(ah, 24)
+    if days == 0:
+        return f"{sign}{hours} {de_plural(hours,'Stunde','Stunden')}"
+    return f"{sign}{days} {de_plural(days,'Tag','Tage')}, {hours} {de_plural(hours,'Stunde','Stunden')}"
+
+# Ansicht je Kiosk-Benutzer in der Session (Schlüssel case-insensitiv wie der Name)
+def _mode_key(name: str) -> str:
+    return f"mode_{name.strip().lower()}"
+
+def _current_mode(name: str) -> int:
+    mode = session.get(_mode_key(name), 1)
+    return mode if mode in MODE_CAPS else 1
+
+def _bucket_query(user_id: int, prio: str, n: int, future_only: bool, today: date):
+    # Offene Tasks einer Dringlichkeit; datierte zuerst (früheste oben), undatierte zuletzt.
+    # Nur die benötigten Spalten als Rows – keine Task-Instanzen/Identity-Map für reine Anzeige
+    where = [Task.assignee_id == user_id, Task.status == Status.open.value, Task.priority == prio]
+    if future_only:
+        where.append(Task.due_date >= today)
+    return (select(Task.id, Task.description, Task.priority, Task.due_date)
+            .where(*where)
+            .order_by(Task.due_date.is_(None), Task.due_date, Task.created_at)
+            .limit(n))
+
+def _compute_state(db: Session, user: Row, mode: int) -> dict:
+    today = date.today()
+
+    # Pro Dringlichkeit max. n offene Tasks – Filter + LIMIT direkt in SQL, statt alle
+    # offenen Tasks zu laden und in Python auszusieben
+    future_only = mode == 1  # Ansicht 1: nur due_date >= heute (keine Vergangenheit, keine undatierten)
+    caps = list(MODE_CAPS[mode].items())
+    if len(caps) == 1:
+        # Ansichten 2-4: eine Dringlichkeit -> direkt eine LIMIT-Abfrage, ohne UNION
+        prio, n = caps[0]
+        tasks_to_show = db.execute(_bucket_query(user.id, prio, n, future_only, today)).all()
+    else:
+        buckets = [
+            _bucket_query(user.id, prio, n, future_only, today)
+            .add_columns(Task.created_at, literal(i).label("bucket")).subquery()
+            for i, (prio, n) in enumerate(caps)
+        ]
+        # SQLite erlaubt kein LIMIT direkt in UNION-Teilen -> je Bucket als Subquery, ein Roundtrip;
+        # created_at/bucket nur für die äußere Sortierung
+        u = union_all(*(select(b) for b in buckets)).subquery()
+        q = (select(u.c.id, u.c.description, u.c.priority, u.c.due_date)
+             .order_by(u.c.bucket, u.c.due_date.is_(None), u.c.due_date, u.c.created_at))
+        tasks_to_show = db.execute(q).all()
+
+    # Uhr nur einmal pro Refresh lesen, nicht pro Task
+    now_ts = datetime.now().timestamp()
+
+    # Alles, was die Karte braucht, hier vorberechnen: Template (und JSON) geben nur noch aus
+    # Modebar-Zähler (aktuelle sichtbare Liste) gleich in derselben Schleife mitzählen
+    rows = []
+    cnt = {}
+    for t in tasks_to_show:
+        cnt[t.priority] = cnt.get(t.priority, 0) + 1
+        h = hours_left_until_day_end(t.due_date, now_ts)
+        rows.append({
+            "id": t.id,
+            "desc": t.description,
+            "prio": t.priority,
+            "cls": PRIO_CLASS.get(t.priority, 'low'),
+            "due": t.due_date,
+            "overdue": t.due_date is not None and t.due_date < today,
+            "hrs": h,
+            "dh": format_days_hours(h) if h is not None else None,
+            "soon": h is not None and h < 24,
+        })
+
+    return dict(rows=rows,
+                cnt_high=cnt.get('hoch', 0),
+                cnt_normal=cnt.get('normal', 0),
+                cnt_low=cnt.get('niedrig', 0))
+
+# Gerenderte Kiosk-Seiten je ETag; neuer Datenstand/Stunde -> neuer Schlüssel, keine Invalidierung nötig
+HTML_CACHE_MAX = 128
+_html_cache: dict[str, str] = {}
+
 @app.route("/kiosk/<name>")
 def kiosk_view(name: str):
     with get_db() as db:
@@ -366,71 +461,7 @@ def kiosk_view(name: str):
         if not user:
             return (f"Unbekannter Benutzer: {name}", 404)
 
-        key = f"mode_{user.name.strip().lower()}"
-        mode = session.get(key, 1)
-        if mode not in (1, 2, 3, 4): mode = 1
-
-        # Offene Aufgaben – datierte zuerst (früheste oben), undatierte zuletzt
-        q = (
-            select(Task)
-            .where(Task.assignee_id == user.id, Task.status == Status.open.value)
-            .order_by(Task.due_date.is_(None), Task.due_date, Task.created_at)
-        )
-        all_open_sorted = db.scalars(q).all()
-
-        today = date.today()
-
-        def base_for_mode():
-            if mode == 1:
-                # Nur due_date >= heute (keine Vergangenheit, keine undatierten)
-                return [t for t in all_open_sorted if t.due_date is not None and t.due_date >= today]
-            # Modi 2–4: inkl. Vergangenheit & undatiert
-            return list(all_open_sorted)
-
-        base = base_for_mode()
-
-        def take(prio: str, n: int):
-            return [t for t in base if t.priority == prio][:n]
-
-        if mode == 1:
-            tasks_to_show = take(Priority.high.value, 1) + \
-                            take(Priority.normal.value, 2) + \
-                            take(Priority.low.value, 1)
-        elif mode == 2:
-            tasks_to_show = take(Priority.high.value, 4)
-        elif mode == 3:
-            tasks_to_show = take(Priority.normal.value, 4)
-        else:
-            tasks_to_show = take(Priority.low.value, 4)
-
-        # Zeit bis Ende des Fälligkeitstags (in Stunden) + Darstellung "x Tag(e), y Stunde(n)"
-        def hours_left_until_day_end(d: Optional[date]) -> Optional[int]:
-            if d is None: return None
-            now = datetime.now()
-            due_end = datetime.combine(d, time(23, 59, 59))
-            delta = due_end - now
-            return math.floor(delta.total_seconds() / 3600)
-
-        def de_plural(n: int, singular: str, plural: str) -> str:
-            return singular if abs(n) == 1 else plural
-
-        def format_days_hours(total_hours: int) -> str:
-            sign = "-" if total_hours < 0 else ""
-            ah = abs(total_hours)
-            days, hours = divmod(ah, 24)
-            if days == 0:
-                return f"{sign}{hours} {de_plural(hours,'Stunde','Stunden')}"
-            return f"{sign}{days} {de_plural(days,'Tag','Tage')}, {hours} {de_plural(hours,'Stunde','Stunden')}"
-
-        hours_left_map = {t.id: hours_left_until_day_end(t.due_date) for t in tasks_to_show}
-        dh_text_map = {tid: (format_days_hours(h) if h is not None else None)
-                       for tid, h in hours_left_map.items()}
-
-        # Modebar-Zähler (aktuelle sichtbare Liste)
-        cnt = Counter(t.priority for t in tasks_to_show)
-        cnt_high   = cnt.get('hoch', 0)
-        cnt_normal = cnt.get('normal', 0)
-        cnt_low    = cnt.get('niedrig', 0)
+        mode = _current_mode(user.name)
 
         # Refresh: Default aus Env, Override per ?refresh=NN
         refresh_sec = max(0, int(REFRESH_SECONDS_DEFAULT))
@@ -440,40 +471,86 @@ def kiosk_view(name: str):
             except Exception: pass
         refresh_ms = refresh_sec * 1000
 
-        return render_template("view.html",
-                               user=user,
-                               tasks_to_show=tasks_to_show,
-                               today=today,
+        # Bedingter GET: Seite hängt nur von Benutzer, Ansicht, Refresh und Datenstand ab
+        version = _data_version(db)
+        etag = _etag(user.id, mode, refresh_sec, ASSET_VERSION, *version)
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
+
+        # Gleicher ETag = gleiche Seite -> fertig gerendertes HTML wiederverwenden
+        # (z. B. mehrere Kiosks desselben Benutzers oder Reload ohne Browser-Cache)
+        html = _html_cache.get(etag)
+        if html is None:
+            html = render_view(user=user,
                                refresh_ms=refresh_ms,
                                refresh_sec=refresh_sec,
-                               hours_left_map=hours_left_map,
-                               dh_text_map=dh_text_map,
                                mode=mode,
-                               cnt_high=cnt_high, cnt_normal=cnt_normal, cnt_low=cnt_low)
+                               state_etag=_state_etag(user.id, mode, version),
+                               **_compute_state(db, user, mode))
+            if len(_html_cache) >= HTML_CACHE_MAX:
+                _html_cache.clear()  # wie _user_cache: einfach leeren, threadsicher ohne Lock
+            _html_cache[etag] = html
+        resp = Response(html)
+        resp.set_etag(etag)
+        return resp
+
+@app.route("/kiosk/<name>/state")
+def kiosk_state(name: str):
+    # Polling-Endpunkt für das Auto-Refresh: nur Daten (JSON), 304 solange unverändert
+    with get_db() as db:
+        user = _ci_name(db, name)
+        if not user:
+            return (f"Unbekannter Benutzer: {name}", 404)
+
+        mode = _current_mode(user.name)
+
+        etag = _state_etag(user.id, mode, _data_version(db))
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
+
+        state = _compute_state(db, user, mode)
+        # orjson statt jsonify: schneller, serialisiert date (due) direkt als ISO-String
+        resp = Response(orjson.dumps({
+            "mode": mode,
+            "asset_version": ASSET_VERSION,
+            "counts": {"hoch": state["cnt_high"], "normal": state["cnt_normal"], "niedrig": state["cnt_low"]},
+            "tasks": state["rows"],
+        }), mimetype="application/json")
+        resp.set_etag(etag)
+        return resp
+
+# Kiosk-Aktion -> neuer Task-Status
+ACTION_STATUS = {"done": Status.done.value, "discard": Status.discarded.value}
 
 @app.route("/kiosk/<name>/action", methods=["POST"])
 def kiosk_action(name: str):
     action = request.form.get("action")
 
     if action == "cycle":
-        key = f"mode_{name.strip().lower()}"
-        mode = session.get(key, 1)
-        session[key] = 1 if mode >= 4 else mode + 1
-        session.modified = True
+        session[_mode_key(name)] = _current_mode(name) % len(MODE_CAPS) + 1
         return redirect(url_for("kiosk_view", name=name))
 
-    task_id = request.form.get("task_id")  # Statusänderung erfordert gewählte Task-ID
-    if not task_id:
+    new_status = ACTION_STATUS.get(action)
+    if new_status is None:
+        return redirect(url_for("kiosk_view", name=name))
+    try:
+        task_id = int(request.form.get("task_id", ""))  # Statusänderung erfordert gewählte Task-ID
+    except ValueError:
         return redirect(url_for("kiosk_view", name=name))
 
     with get_db() as db:
-        task = db.get(Task, int(task_id))
-        if not task:
+        user = _ci_name(db, name)
+        if not user:
             return redirect(url_for("kiosk_view", name=name))
-        if action == "done":
-            task.status = Status.done.value
-        elif action == "discard":
-            task.status = Status.discarded.value
+        # Ein UPDATE statt SELECT + ORM-Flush; nur offene Tasks des eigenen Kiosk-Benutzers
+        # (doppelt abgeschickte Aktionen ändern nichts mehr)
+        db.execute(
+            update(Task)
+            .where(Task.id == task_id, Task.assignee_id == user.id, Task.status == Status.open.value)
+            .values(status=new_status)
+        )
         db.commit()
     return redirect(url_for("kiosk_view", name=name))
 
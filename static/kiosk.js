@@ -0,0 +1,163 @@
+// Auswahl-Logik
+const selectTask = (id) => {
+  document.querySelectorAll('.task').forEach(el=>el.classList.remove('sel'));
+  const el=document.querySelector(`.task[data-id="${id}"]`);
+  if(el){el.classList.add('sel');}
+  const hidden=document.getElementById('selected_task_id');
+  if(hidden) hidden.value=id;
+};
+
+// Ein delegierter Listener statt onclick pro Karte (gilt auch für per Polling neu gerenderte Karten)
+const leftPane = document.querySelector('.left');
+if(leftPane){
+  leftPane.addEventListener('click', (e)=>{
+    const el = e.target.closest('.task');
+    if(el) selectTask(el.dataset.id);
+  });
+}
+
+// Buttons & Confirm
+let pendingAction = null;
+const form         = document.getElementById('action_form');
+const btnDone      = document.getElementById('btn_done');
+const btnDiscard   = document.getElementById('btn_discard');
+const btnCycle     = document.getElementById('btn_cycle');
+const overlay      = document.getElementById('confirm_overlay');
+const confirmText  = document.getElementById('confirm_text');
+const confirmOk    = document.getElementById('confirm_ok');
+const confirmCancel= document.getElementById('confirm_cancel');
+const actionInput  = document.getElementById('action_input');
+
+function openConfirm(action){
+  const id = document.getElementById('selected_task_id').value;
+  if(!id){ alert("Bitte zuerst eine Aufgabe auswählen."); return; }
+  pendingAction = action;
+  const el = document.querySelector(`.task[data-id="${id}"] .desc`);
+  const title = (action==='done' ? "Erledigt" : "Verwerfen");
+  confirmText.textContent = `${title} – „${el ? el.textContent : 'Ausgewählte Aufgabe'}“?`;
+  confirmOk.classList.remove('ok','bad','btn');
+  confirmOk.classList.add(action==='done' ? 'ok' : 'bad', 'btn');
+  overlay.style.display='flex';
+}
+function closeConfirm(){ overlay.style.display='none'; pendingAction=null; }
+
+if(btnDone){    btnDone.addEventListener('click', ()=>openConfirm('done')); }
+if(btnDiscard){ btnDiscard.addEventListener('click', ()=>openConfirm('discard')); }
+if(btnCycle){   btnCycle.addEventListener('click', ()=>{ actionInput.value='cycle'; form.submit(); }); }
+
+confirmCancel.addEventListener('click', closeConfirm);
+confirmOk.addEventListener('click', ()=>{
+  if(!pendingAction) return;
+  actionInput.value=pendingAction;
+  closeConfirm();
+  form.submit();
+});
+
+// Erste Auswahl vornehmen
+window.addEventListener('DOMContentLoaded',()=>{
+  const first=document.querySelector('.task');
+  if(first) selectTask(first.dataset.id);
+});
+
+// Modebar Toggle (Minimal <-> Mehrzeilig-Detail), Zustand in localStorage
+function renderModebar(){
+  const el = document.getElementById('modebar');
+  if(!el) return;
+  const expanded = localStorage.getItem('modebarExpanded') === '1';
+  const minText  = el.dataset.min;   // "Ansicht X"
+  const fullText = el.dataset.full;  // "Ansicht X\n...Zähler...\nAktualisierung alle Ns"
+  el.textContent = expanded ? fullText : minText; // white-space:pre-line aktiv
+}
+window.addEventListener('DOMContentLoaded', ()=>{
+  const el = document.getElementById('modebar');
+  if(el){
+    renderModebar();
+    el.addEventListener('click', ()=>{
+      const expanded = localStorage.getItem('modebarExpanded') === '1';
+      localStorage.setItem('modebarExpanded', expanded ? '0' : '1');
+      renderModebar();
+    });
+  }
+});
+
+// Auto-Refresh per Polling (pausiert, wenn Confirm-Dialog offen ist) + kleiner Jitter:
+// holt nur JSON vom /state-Endpunkt (304 solange unverändert) und ersetzt geänderte Karten
+const REFRESH_MS = parseInt(document.body.dataset.refreshMs || '0', 10);
+const STATE_URL  = document.body.dataset.stateUrl;
+let lastEtag     = `"${document.body.dataset.stateEtag}"`;
+
+const esc = (s) => String(s).replace(/[&<>"']/g, c => ({'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}[c]));
+
+function taskHtml(t){
+  const overdue = t.overdue ? '<div class="tag overdue">Überfällig</div>' : '';
+  const hrs = (t.hrs === null) ? '' :
+    `(<span class="timebreak ${t.soon ? 'soon' : ''}">${esc(t.dh)}</span>)`;
+  return `<div class="task ${t.cls}" data-id="${t.id}">` +
+         `<div class="hdr"><div class="desc">${esc(t.desc)}</div>` +
+         `<div class="tags"><div class="tag ${t.cls}">${esc(t.prio)}</div>${overdue}</div></div>` +
+         `<div class="due">Fällig: ${t.due ? esc(t.due) : '–'} ${hrs}</div></div>`;
+}
+
+function patchDom(state){
+  if (state.asset_version !== document.body.dataset.assetVersion) {
+    window.location.reload();  // neues Deployment -> CSS/JS neu laden
+    return;
+  }
+  const left = document.querySelector('.left');
+  const selected = document.getElementById('selected_task_id');
+  const selId = selected ? selected.value : '';
+  const old = {};
+  left.querySelectorAll('.task').forEach(el => { old[el.dataset.id] = el; });
+
+  const frag = document.createDocumentFragment();
+  state.tasks.forEach(t => {
+    const v = JSON.stringify(t);
+    let el = old[t.id];
+    if (!el || el.dataset.v !== v) {  // nur geänderte Karten neu aufbauen
+      const tmp = document.createElement('div');
+      tmp.innerHTML = taskHtml(t);
+      el = tmp.firstElementChild;
+      el.dataset.v = v;
+    }
+    frag.appendChild(el);
+  });
+  if (!state.tasks.length) {
+    const empty = document.createElement('div');
+    empty.className = 'empty';
+    empty.textContent = 'Keine offenen Aufgaben';
+    frag.appendChild(empty);
+  }
+  left.replaceChildren(frag);
+
+  const keep = state.tasks.some(t => String(t.id) === selId);
+  const first = left.querySelector('.task');
+  if (keep) selectTask(selId);
+  else if (first) selectTask(first.dataset.id);
+  else if (selected) selected.value = '';
+
+  const mb = document.getElementById('modebar');
+  if (mb) {
+    const c = state.counts;
+    mb.dataset.min  = `Ansicht ${state.mode}`;
+    mb.dataset.full = `Ansicht ${state.mode}\n${c.hoch}x hoch, ${c.normal}x normal, ${c.niedrig}x niedrig\n` +
+                      `Aktualisierung alle ${REFRESH_MS / 1000} sec`;
+    renderModebar();
+  }
+}
+
+if (REFRESH_MS > 0 && STATE_URL) {
+  const jitter = Math.floor(Math.random()*500); // 0..499ms
+  setInterval(() => {
+    const ov = document.getElementById('confirm_overlay');
+    const isOpen = ov && getComputedStyle(ov).display !== 'none';
+    if (isOpen) return;
+    fetch(STATE_URL, {cache: 'no-store', headers: {'If-None-Match': lastEtag}})
+      .then(r => {
+        if (r.status === 304 || !r.ok) return null;
+        lastEtag = r.headers.get('ETag') || lastEtag;
+        return r.json();
+      })
+      .then(state => { if (state) patchDom(state); })
+      .catch(() => {});
+  }, REFRESH_MS + jitter);
+}